@@ -21,7 +21,7 @@ setup(
     description='Timezone aware Cron/Quartz parser',
     license="Apache",
     py_modules=['tzcron'],
-    install_requires=['python-dateutil', 'six', 'pytz'],
+    install_requires=['python-dateutil', 'pytz'],
     url='https://github.com/bloomberg/tzcron',
     author='Mario Corchero',
     author_email='mariocj89@gmail.com',
@@ -41,8 +41,6 @@ setup(
         'License :: OSI Approved :: Apache Software License',
         'Development Status :: 4 - Beta',
         'Operating System :: OS Independent',
-        'Programming Language :: Python :: 2',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
         'Programming Language :: Python :: 3.3',
         'Programming Language :: Python :: 3.4',
@@ -13,11 +13,17 @@
 # limitations under the License.
 
 import datetime as dt
+import itertools
 import unittest
 
 import ddt
 import pytz
 
+try:
+    import zoneinfo
+except ImportError:
+    zoneinfo = None
+
 import tzcron
 
 
@@ -105,6 +111,52 @@ class TestSchedule(unittest.TestCase):
         expected_time = timezone.localize(expected_time, is_dst=False)
         self.assertEqual(str(expected_time), str(next_it))
 
+    def test_weekday_daily_schedule(self):
+        cron_expression = "0 9 * * 1-5 *"
+        timezone = pytz.utc
+        start = dt.datetime(2016, 6, 4, 12).replace(tzinfo=timezone)  # Saturday
+        testee = tzcron.Schedule(cron_expression, timezone, start)
+        next_it = next(testee)
+
+        expected_time = dt.datetime(2016, 6, 6, 9).replace(tzinfo=timezone)
+        self.assertEqual(next_it, expected_time)
+
+    def test_literal_year(self):
+        cron_expression = "0 23 31 12 * 2015"
+        timezone = pytz.utc
+        start = dt.datetime(2015, 1, 1).replace(tzinfo=timezone)
+        testee = tzcron.Schedule(cron_expression, timezone, start)
+
+        occurrences = list(testee)
+
+        expected_time = dt.datetime(2015, 12, 31, 23).replace(tzinfo=timezone)
+        self.assertEqual(occurrences, [expected_time])
+
+    def test_literal_year_with_later_end_date(self):
+        cron_expression = "0 23 31 12 * 2015"
+        timezone = pytz.utc
+        start = dt.datetime(2015, 1, 1).replace(tzinfo=timezone)
+        end = dt.datetime(2017, 1, 1).replace(tzinfo=timezone)
+        testee = tzcron.Schedule(cron_expression, timezone, start, end)
+
+        occurrences = list(testee)
+
+        expected_time = dt.datetime(2015, 12, 31, 23).replace(tzinfo=timezone)
+        self.assertEqual(occurrences, [expected_time])
+
+    def test_between(self):
+        cron_expression = "0 5 * * 5 *"
+        timezone = pytz.utc
+        start = dt.datetime(1989, 4, 24).replace(tzinfo=timezone)
+        end = dt.datetime(1989, 5, 7).replace(tzinfo=timezone)
+        testee = tzcron.Schedule(cron_expression, timezone, start)
+
+        occurrences = testee.between(start, end)
+
+        expected = [dt.datetime(1989, 4, 28, 5).replace(tzinfo=timezone),
+                    dt.datetime(1989, 5, 5, 5).replace(tzinfo=timezone)]
+        self.assertEqual(occurrences, expected)
+
     def test_end_dst_double_occurrence(self):
         cron_expression = "30 1 * * * *"
         timezone = pytz.timezone("Europe/London")
@@ -116,6 +168,37 @@ class TestSchedule(unittest.TestCase):
                           lambda: next(testee))
 
 
+@unittest.skipIf(zoneinfo is None, "zoneinfo is not available")
+class TestZoneInfoSchedule(unittest.TestCase):
+    """Test suite for stdlib zoneinfo timezones"""
+
+    def setUp(self):
+        self.timezone = zoneinfo.ZoneInfo("Europe/London")
+
+    def test_next_occurrence(self):
+        cron_expression = "30 5 * * * *"
+        start = dt.datetime(2015, 3, 28, tzinfo=self.timezone)
+        testee = tzcron.Schedule(cron_expression, self.timezone, start)
+        next_it = next(testee)
+
+        expected_time = dt.datetime(2015, 3, 28, 5, 30, tzinfo=self.timezone)
+        self.assertEqual(next_it, expected_time)
+
+    def test_start_dst_invalid_occurrence(self):
+        cron_expression = "30 1 * * * *"
+        start = dt.datetime(2015, 3, 29, tzinfo=self.timezone)
+        testee = tzcron.Schedule(cron_expression, self.timezone, start)
+        self.assertRaises(pytz.NonExistentTimeError,
+                          lambda: next(testee))
+
+    def test_end_dst_double_occurrence(self):
+        cron_expression = "30 1 * * * *"
+        start = dt.datetime(2015, 10, 25, tzinfo=self.timezone)
+        testee = tzcron.Schedule(cron_expression, self.timezone, start)
+        self.assertRaises(pytz.AmbiguousTimeError,
+                          lambda: next(testee))
+
+
 @ddt.ddt
 class TestInvalidSchedules(unittest.TestCase):
     """Test suite for invalid expressions"""
@@ -149,6 +232,14 @@ class TestInvalidSchedules(unittest.TestCase):
         self.assertRaises(tzcron.InvalidExpression, tzcron.Schedule,
                           expression, self.timezone, self.now)
 
+    @ddt.data(
+        "* * * * * 20I5",
+        "* * * * * 2015.5",
+    )
+    def test_invalid_year(self, expression):
+        self.assertRaises(tzcron.InvalidExpression, tzcron.Schedule,
+                          expression, self.timezone, self.now)
+
 
 @ddt.ddt
 class TestSpecificDates(unittest.TestCase):
@@ -190,5 +281,42 @@ class TestSpecificDates(unittest.TestCase):
         self.assertEqual(next(results), expected_date)
 
 
+@ddt.ddt
+class TestPromotedFrequencies(unittest.TestCase):
+    """Test suite for expressions generated above minutely frequency
+
+    Pinned minute and hour promote the rrule to daily frequency, and a
+    pinned month day without a weekday to monthly.
+    """
+
+    def setUp(self):
+        self.start = dt.datetime(2016, 5, 31, 12, 30).replace(tzinfo=pytz.utc)
+        self.timezone = pytz.timezone("UTC")
+
+    @ddt.data(
+        # multiple minutes/hours on weekdays: daily frequency
+        ("0,30 9,17 * * 1-5 *",
+         ["2016-05-31T17:00:00", "2016-05-31T17:30:00",
+          "2016-06-01T09:00:00", "2016-06-01T09:30:00"]),
+        # pinned month day without weekday: monthly frequency, leap day
+        ("0 0 29 2 * *",
+         ["2020-02-29T00:00:00", "2024-02-29T00:00:00"]),
+        # month day plus weekday stays daily: the 15th falling on Wednesday
+        ("0 12 15 * 3 *",
+         ["2016-06-15T12:00:00", "2017-02-15T12:00:00",
+          "2017-03-15T12:00:00"]),
+    )
+    @ddt.unpack
+    def test_first_occurrences(self, expression, expected):
+        testee = tzcron.Schedule(expression, self.timezone, self.start)
+
+        occurrences = list(itertools.islice(testee, len(expected)))
+
+        expected_times = [
+            dt.datetime.strptime(occurrence, "%Y-%m-%dT%H:%M:%S")
+            .replace(tzinfo=pytz.utc) for occurrence in expected]
+        self.assertEqual(occurrences, expected_times)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -26,11 +26,11 @@ The key terms used in the documentations are:
 As an example, a schedule is every tuesday at 2pm in London,
 an occurrence is next tuesday at 2pm with an offset from utc of +60 minutes.
 """
+import bisect
 import datetime as dt
-import itertools
+import functools
 import re
 
-import six
 import pytz
 from dateutil import rrule
 
@@ -47,11 +47,17 @@ __all__ = ["Schedule", "InvalidExpression"]
 # .......................... min (0 - 59)
 
 
+_UTC = pytz.utc
+_ONE_SECOND = dt.timedelta(seconds=1)
+_ONE_MICROSECOND = dt.timedelta(microseconds=1)
+_ONE_DAY = dt.timedelta(days=1)
+
+
 class InvalidExpression(Exception):
     """Custom exception when we fail to parse an cron/quartz expression"""
 
 
-class Schedule(six.Iterator):
+class Schedule(object):
     """Schedule allows to get a list of occurrences given a cron specification and tz
 
     Schedule is a class that relying in dateutil.rrule generates a list of
@@ -69,13 +75,18 @@ class Schedule(six.Iterator):
     with a calendar.
     """
 
+    __slots__ = ("t_zone", "expression", "start_date", "end_date", "_is_utc",
+                 "_has_localize", "_fixed", "_rrule", "_rrule_iterator",
+                 "_tz_window", "filters", "_str")
+
     def __init__(self, expression, t_zone, start_date=None, end_date=None, filters=None):
         """Creates a schedule definition
 
         :param expression: cron expression defining the schedule
         :type expression: str
         :param t_zone: timezone we want the schedule to be applied on
-        :type t_zone: instance of a subclass of tzinfo
+        :type t_zone: instance of a subclass of tzinfo, either a pytz
+         timezone or a fold aware one like zoneinfo.ZoneInfo
         :param start_date: inclusive date to start to generate occurrences.
          Defaults to now
         :type start_date: datetime (with tzinfo)
@@ -85,55 +96,305 @@ class Schedule(six.Iterator):
         :param filters: list of extra functions to filter occurrences.
         :type filters: list of callable
         """
-        start_date = start_date or dt.datetime.now(pytz.utc)  # starts defaults to now
+        start_date = start_date or dt.datetime.now(_UTC)  # starts defaults to now
 
         self.t_zone = t_zone
         self.expression = expression
         self.start_date = start_date
         self.end_date = end_date
+        self._is_utc = t_zone is _UTC or str(t_zone) == "UTC"
+        self._has_localize = hasattr(t_zone, "localize")  # pytz style zone
+        # zones without any transition (UTC, fixed offsets and static pytz
+        # zones) can never produce ambiguous or non existent times
+        self._fixed = self._is_utc or (
+            self._has_localize
+            and not getattr(t_zone, "_utc_transition_times", None))
 
         if start_date.tzinfo is None or (end_date and end_date.tzinfo is None):
             raise TypeError("Start and End dates should have a timezone")
 
-        start_t = start_date.astimezone(self.t_zone)
-        end_t = end_date.astimezone(self.t_zone) if end_date else None
+        # astimezone between identical zones still pays a full conversion,
+        # UTC to UTC needs none at all
+        if self._is_utc and start_date.tzinfo is _UTC:
+            start_t = start_date
+        else:
+            start_t = start_date.astimezone(self.t_zone)
+        if end_date and not (self._is_utc and end_date.tzinfo is _UTC):
+            end_t = end_date.astimezone(self.t_zone)
+        else:
+            end_t = end_date
 
         # all datetime objects are in the desired tz. Lets strip out the timezones
         start_t = start_t.replace(tzinfo=None)
         end_t = end_t.replace(tzinfo=None) if end_t else None
 
         self._rrule = process(expression, start_t, end_t)
-        self.__rrule_iterator = iter(self._rrule)
-        self.filters = filters or []
-        self.filters.append(get_year_filter(self.expression.split(" ")[-1]))
+        self._rrule_iterator = None  # built lazily on the first iteration
+        self._tz_window = None  # (start, end, tzinfo) of the current DST period
+        if end_t is not None and not self._fixed and self._has_localize:
+            self._prime_tz_window(start_t, end_t)
+        # the year token needs no filter anymore: a star year always passes
+        # and concrete years are bounded inside the rrule itself
+        self.filters = list(filters) if filters else []
+
+        # the schedule is immutable once built, format its string just once
+        self._str = "Cron: {} @{} [{}->{}]".format(self.expression, self.t_zone,
+                                                   self.start_date, self.end_date)
 
     def __str__(self):
-        return "Cron: {} @{} [{}->{}]".format(self.expression, self.t_zone,
-                                              self.start_date, self.end_date)
+        return self._str
 
     def __iter__(self):
         return self
 
+    def between(self, start, end):
+        """Returns all occurrences of the schedule within a window
+
+        Occurrences are generated in bulk through rrule and localized and
+        filtered as a batch, which is cheaper than stepping the iterator
+        when many occurrences of a window are wanted at once.
+
+        :param start: inclusive date where the window starts
+        :type start: datetime (with tzinfo)
+        :param end: inclusive date where the window ends
+        :type end: datetime (with tzinfo)
+        returns: list of occurrences within the window
+        """
+        if start.tzinfo is None or end.tzinfo is None:
+            raise TypeError("Start and End dates should have a timezone")
+
+        start_t = start.astimezone(self.t_zone).replace(tzinfo=None)
+        end_t = end.astimezone(self.t_zone).replace(tzinfo=None)
+
+        occurrences = [self._localize(occurrence)
+                       for occurrence in
+                       self._rrule.between(start_t, end_t, inc=True)]
+
+        result = []
+        for occurrence in occurrences:
+            try:
+                if self._passes_filters(occurrence):
+                    result.append(occurrence)
+            except StopIteration:  # a filter flagged the end of the schedule
+                break
+        return result
+
+    def _passes_filters(self, occurrence):
+        """Returns whether an occurrence passes all the schedule filters
+
+        Stops at the first filter rejecting the occurrence so later,
+        potentially expensive, filters are not called for nothing.
+        """
+        for filt in self.filters:
+            if not filt(occurrence):
+                return False
+        return True
+
     def __next__(self):
         """
         Returns the next occurrence or raises StopIteration
         This method adds some extra validation for the returned
         iteration that are not natively handled by rrule
         """
+        # bound to locals so occurrences rejected by a filter do not pay
+        # the attribute lookups again on every lap of the loop
+        iterator = self._rrule_iterator
+        if iterator is None:
+            iterator = self._rrule_iterator = iter(self._rrule)
+        localize = self._localize
+        filters = self.filters
         while True:
-            next_it = next(self.__rrule_iterator)
-            next_it = self.t_zone.localize(next_it, is_dst=None)
+            next_it = localize(next(iterator))
 
-            if not all([filt(next_it) for filt in self.filters]):
-                continue
+            # no filters is the common case and needs no dispatch at all
+            if not filters or self._passes_filters(next_it):
+                return next_it
 
-            return next_it
+    def _localize(self, naive):
+        """Attaches the schedule timezone to a naive occurrence
+
+        pytz localize bisects the timezone transition table on every call
+        but consecutive occurrences almost always fall within the same DST
+        period, so the current period is cached and reused until an
+        occurrence leaves it. Fold aware zones such as zoneinfo.ZoneInfo
+        have no localize and go through the fold based checks instead.
+        """
+        if self._fixed:  # no transitions means nothing to look up
+            return naive.replace(tzinfo=self.t_zone)
+
+        window = self._tz_window
+        if window is not None and window[0] <= naive < window[1]:
+            return naive.replace(tzinfo=window[2])
+
+        if not self._has_localize:
+            return self._localize_fold(naive)
+
+        aware = self.t_zone.localize(naive, is_dst=None)
+        self._cache_tz_window(aware)
+        return aware
+
+    def _localize_fold(self, naive):
+        """Attaches a fold aware timezone to a naive occurrence
+
+        Mirrors pytz's is_dst=None behaviour on top of PEP 495: when the
+        two folds disagree on the offset the time is either ambiguous or
+        non existent, which an utc round trip tells apart, and the same
+        pytz exceptions are raised so callers handle both zone styles the
+        same way.
+        """
+        aware = naive.replace(tzinfo=self.t_zone)
+        if aware.utcoffset() != naive.replace(tzinfo=self.t_zone, fold=1).utcoffset():
+            round_trip = aware.astimezone(_UTC).astimezone(self.t_zone)
+            if round_trip.replace(tzinfo=None) != naive:
+                raise pytz.exceptions.NonExistentTimeError(naive)
+            raise pytz.exceptions.AmbiguousTimeError(naive)
+        return aware
+
+    def _cache_tz_window(self, aware):
+        """Caches the DST period an aware occurrence falls in
+
+        The cached window is shrunk on both sides so that any time close
+        enough to a transition to be ambiguous or non existent still goes
+        through the full localize and keeps raising as before.
+        """
+        transitions = getattr(self.t_zone, "_utc_transition_times", None)
+        if not transitions:
+            return
+        utc_time = aware.replace(tzinfo=None) - aware.utcoffset()
+        index = bisect.bisect_right(transitions, utc_time) - 1
+        if index < 1 or index + 1 >= len(transitions):
+            return
+
+        infos = self.t_zone._transition_info
+        offset = infos[index][0]
+        previous_offset = infos[index - 1][0]
+        next_offset = infos[index + 1][0]
+
+        window_start = transitions[index] + max(offset, previous_offset)
+        window_end = transitions[index + 1] + min(offset, next_offset)
+        if window_start < window_end:
+            self._tz_window = (window_start, window_end, aware.tzinfo)
+
+    def _prime_tz_window(self, start_t, end_t):
+        """Pins the DST window up front for schedules that cannot leave it
+
+        A schedule bounded to a window more than a day clear of every DST
+        transition behaves like one on a fixed offset zone: a single
+        tzinfo covers its whole life, so it is cached here and no
+        occurrence ever pays a transition lookup. The day of margin
+        absorbs the offset between the naive local bounds and the utc
+        transition table being bisected.
+        """
+        transitions = self.t_zone._utc_transition_times
+        index = bisect.bisect_right(transitions, start_t - _ONE_DAY)
+        if index < 1 or index != bisect.bisect_right(transitions, end_t + _ONE_DAY):
+            return  # a transition could fall close to or inside the window
+        tzinfo = self.t_zone._tzinfos[self.t_zone._transition_info[index - 1]]
+        self._tz_window = (start_t, end_t + _ONE_SECOND, tzinfo)
 
 
 # Private helpers
 
 
-class Parser(object):
+def _normalize_start(start_date):
+    """Moves a start date off a minute boundary rrule would re-emit
+
+    As rrule will strip out microseconds, we need to do this hack :)
+    We could use .after but that changes the iface
+    The idea is, as the cron expresion works at minute level, it is fine to
+    set the start time one second after the minute. The key is not to generate
+    the current minute.
+    Ex: if start time is 05:00.500 you should not generate 05:00
+    """
+    if start_date.second == 0 and start_date.microsecond != 0:
+        return start_date + _ONE_SECOND
+    return start_date
+
+
+class _DailySchedule(object):
+    """Specialized occurrence generator for daily single-time schedules
+
+    Expressions that pin the minute and the hour to one value each and
+    leave the month and month day free (optionally restricting the week
+    day) have exactly one candidate per day, so walking dates directly is
+    far cheaper than rrule ticking through every minute and filtering.
+
+    It covers the small part of the rrule interface Schedule relies on.
+    """
+
+    def __init__(self, hour, minute, weekdays, dtstart, until):
+        self._time = dt.time(hour, minute)
+        self._weekdays = weekdays  # None means any day, values as weekday()
+        self._dtstart = dtstart
+        self._until = until
+
+    def _iter_from(self, earliest):
+        occurrence = dt.datetime.combine(earliest.date(), self._time)
+        if occurrence < earliest:
+            occurrence += _ONE_DAY
+        while self._until is None or occurrence <= self._until:
+            if self._weekdays is None or occurrence.weekday() in self._weekdays:
+                yield occurrence
+            occurrence += _ONE_DAY
+
+    def __iter__(self):
+        return self._iter_from(self._dtstart)
+
+    def between(self, after, before, inc=False):
+        """Returns the occurrences within the given window, rrule style"""
+        result = []
+        for occurrence in self._iter_from(max(self._dtstart, after)):
+            if occurrence > before:
+                break
+            if not inc and (occurrence == after or occurrence == before):
+                continue
+            result.append(occurrence)
+        return result
+
+
+def _scan_item(expression):
+    """Splits a single item into its (start, end, step) string parts
+
+    Hand written scanner replacing the previous regular expression,
+    the grammar is small enough that a couple of find calls beat the
+    regex engine on the per-token hot path.
+    """
+    step = None
+    slash = expression.rfind('/')
+    if slash != -1:
+        step = expression[slash + 1:]
+        expression = expression[:slash]
+    end = None
+    dash = expression.find('-', 1)  # position 0 would be a sign, not a range
+    if dash != -1:
+        end = expression[dash + 1:]
+        expression = expression[:dash]
+    return expression, end, step
+
+
+class _ParserMeta(type):
+    """Metaclass preparing each parser's replacements at class creation
+
+    The replacement names are compiled into a single alternation regex,
+    with the longer names first so a shorter one can never be matched
+    inside a longer one, giving the range form fallback one linear scan
+    instead of one str.replace pass per known name.
+    """
+
+    def __init__(cls, name, bases, namespace):
+        super(_ParserMeta, cls).__init__(name, bases, namespace)
+        if cls.REPLACEMENTS:
+            names = sorted(cls.REPLACEMENTS, key=len, reverse=True)
+            cls._REPL_RE = re.compile("|".join(map(re.escape, names)))
+        else:
+            cls._REPL_RE = None
+        if cls.MIN_VALUE is not None:
+            size = cls.MAX_VALUE - cls.MIN_VALUE + 1
+            cls._ALL_MASK = ((1 << size) - 1) << cls.MIN_VALUE
+            cls._ALL_VALUES = tuple(range(cls.MIN_VALUE, cls.MAX_VALUE + 1))
+
+
+class Parser(object, metaclass=_ParserMeta):
     """Abstract class to create parsers for parts of quartz expressions
 
     Each parser can be used per token and a specific parser needs to provide
@@ -171,42 +432,76 @@ class Parser(object):
     MAX_VALUE = None  # Max value inclusive the expression can have
     REPLACEMENTS = {}  # String replacements for the expression.
 
-    QUARTZ_REGEXP = re.compile(r"(?P<start>(\d+)|\*)(-(?P<end>\d+))?(/(?P<step>\d+))?")
-
     @classmethod
     def _parse_item(cls, expression):
         """Parses one of the comma separated expressions within the full quartz"""
         expression = expression.upper()
-        for key, value in cls.REPLACEMENTS.items():
-            expression = expression.replace(key, value)
-        matches = cls.QUARTZ_REGEXP.match(expression)
-        if not matches:
-            raise InvalidExpression("Invalid expression: {}".format(expression))
-        start = matches.group("start")
-        end = matches.group("end") or start
-        step = matches.group("step") or 1
+        if cls.REPLACEMENTS:
+            # names are whole tokens (JAN, MON...) so a single lookup covers
+            # the common case, ranges like MON-FRI fall back to the full pass
+            expression = cls.REPLACEMENTS.get(expression, expression)
+            if any(char.isalpha() for char in expression):
+                expression = cls._REPL_RE.sub(
+                    lambda match: cls.REPLACEMENTS[match.group(0)], expression)
+
+        # the two shapes that dominate real expressions need no scanning
+        if expression == "*":
+            return cls._ALL_MASK
+        if expression.isdigit():
+            value = int(expression)
+            if value < cls.MIN_VALUE or value > cls.MAX_VALUE:
+                raise InvalidExpression("{} produces items out of {}"
+                                        .format(expression, cls.__name__))
+            return 1 << value
+
+        start, end, step = _scan_item(expression)
 
         if start == "*":
             start = cls.MIN_VALUE
             end = cls.MAX_VALUE
 
-        values = six.moves.range(int(start), int(end) + 1, int(step))
+        try:
+            start = int(start)
+            end = int(end) if end is not None else start
+            step = int(step) if step is not None else 1
+        except ValueError:
+            raise InvalidExpression("Invalid expression: {}".format(expression))
 
-        if not all(cls.MIN_VALUE <= x <= cls.MAX_VALUE for x in values):
+        if start < cls.MIN_VALUE or end > cls.MAX_VALUE:
             raise InvalidExpression("{} produces items out of {}"
                                     .format(expression, cls.__name__))
 
-        return values
+        mask = 0
+        for value in range(start, end + 1, step):
+            mask |= 1 << value
+        return mask
 
     @classmethod
+    @functools.lru_cache(maxsize=256)
     def parse(cls, expression):
         """Parses the quartz expression
 
+        The result is an immutable tuple so it is memoized per parser and
+        shared between all the expressions using the same field value.
+
         :param expression: expression string encoded to parse
-        returns: sorted list of unique elements resulting from the expression
+        returns: sorted tuple of unique elements resulting from the expression
         """
-        groups = [cls._parse_item(item) for item in expression.split(',')]
-        return sorted(list(set(itertools.chain(*groups))))
+        mask = 0
+        for item in expression.split(','):
+            mask |= cls._parse_item(item)
+
+        if mask == cls._ALL_MASK:  # full ranges share one prebuilt tuple
+            return cls._ALL_VALUES
+
+        # peel the set bits off the mask lowest first, giving the sorted
+        # unique values without scanning the positions that are not set
+        values = []
+        while mask:
+            bit = mask & -mask
+            values.append(bit.bit_length() - 1)
+            mask ^= bit
+        return tuple(values)
 
 
 class MinuteParser(Parser):
@@ -262,15 +557,25 @@ class WeekDayParser(Parser):
     }
 
 
-def parse_cron(expression):
-    """parses a cron expression into a dict"""
+@functools.lru_cache(maxsize=1024)
+def _parse_cron_frozen(expression):
+    """parses a cron expression into its frozen rrule arguments
+
+    Returns a tuple of (key, values) pairs plus the raw year token, so
+    callers needing the year do not have to split the expression again.
+    The result is immutable so it can be safely cached and shared between
+    schedules using the same expression.
+    """
     try:
-        minute, hour, monthday, month, weekday, _ = expression.split(' ')
+        minute, hour, monthday, month, weekday, year = expression.split(' ', 5)
     except ValueError:
         raise InvalidExpression("Invalid number of items in expression: {}"
                                 .format(expression))
+    if ' ' in year:  # a bounded split leaves any extra items in the last one
+        raise InvalidExpression("Invalid number of items in expression: {}"
+                                .format(expression))
     result = dict()
-    result["bysecond"] = [0]
+    result["bysecond"] = (0,)
     if minute != "*":
         result["byminute"] = MinuteParser.parse(minute)
     if hour != "*":
@@ -281,59 +586,106 @@ def parse_cron(expression):
         result["bymonth"] = MonthParser.parse(month)
     if weekday != "*":
         # rrule uses 0 to 6 for monday to sunday
-        result["byweekday"] = [d - 1 for d in WeekDayParser.parse(weekday)]
+        result["byweekday"] = tuple(d - 1 for d in WeekDayParser.parse(weekday))
+
+    return tuple(result.items()), year
 
-    return result
+
+def parse_cron(expression):
+    """parses a cron expression into a dict"""
+    return dict(_parse_cron_frozen(expression)[0])
 
 
+@functools.lru_cache(maxsize=1024)
 def process(expression, start_date, end_date=None):
-    """Given a cron expression and a start/end date returns an rrule
+    """Given a cron expression and a start/end date returns an occurrence
+    generator, either a dateutil rrule or an equivalent specialized one.
     Works with "naive" datetime objects.
+
+    Callers should only rely on iterating the result and on its
+    between(after, before, inc) method, not on the full rrule API.
+
+    The result is memoized so schedulers rebuilding the same schedule
+    repeatedly (same expression and window) reuse the generator instance.
     """
     if start_date.tzinfo or (end_date and end_date.tzinfo):
         raise TypeError("Timezones are forbidden in this land.")
 
-    arguments = parse_cron(expression)
-
-    # as rrule will strip out microseconds, we need to do this hack :)
-    # we could use .after but that changes the iface
-    # The idea is, as the cron expresion works at minute level, it is fine to
-    # set the start time one second after the minute. The key is not to generate
-    # the current minute.
-    # Ex: if start time is 05:00.500 you should not generate 05:00
-    if start_date.second == 0 and start_date.microsecond != 0:
-        start_date = start_date + dt.timedelta(0, 1)
+    pairs, year = _parse_cron_frozen(expression)
+    arguments = dict(pairs)
+
+    # a concrete year bounds the rrule itself so it stops generating at the
+    # end of the year instead of producing occurrences a filter discards
+    if year != "*":
+        try:
+            year = int(year)
+        except ValueError:
+            raise InvalidExpression("Invalid year in expression: {}"
+                                    .format(expression))
+        year_end = dt.datetime(year + 1, 1, 1) - _ONE_MICROSECOND
+        start_date = max(start_date, dt.datetime(year, 1, 1))
+        end_date = min(end_date, year_end) if end_date else year_end
+
+    start_date = _normalize_start(start_date)
+
+    # schedules with a single daily occurrence skip rrule entirely
+    byminute = arguments.get("byminute")
+    byhour = arguments.get("byhour")
+    if (byminute is not None and len(byminute) == 1
+            and byhour is not None and len(byhour) == 1
+            and "bymonth" not in arguments and "bymonthday" not in arguments):
+        weekdays = arguments.get("byweekday")
+        return _DailySchedule(byhour[0], byminute[0],
+                              frozenset(weekdays) if weekdays else None,
+                              start_date, end_date)
 
     arguments["dtstart"] = start_date
     if end_date:
         arguments["until"] = end_date
 
-    # TODO: This can be optimized to values bigger than minutely
-    # by checking if the minutes and hours are provided.
-    # After hours (rrule.DAILY) it gets trickier as we have multiple
-    # parameters affecting the recurrence (weekday/ month-day)
-    return rrule.rrule(rrule.MINUTELY, **arguments)
+    # when both the minute and the hour are pinned the by* terms expand to
+    # the same occurrences at a coarser frequency, letting rrule step by
+    # days (or months when the month day is pinned too) instead of ticking
+    # through every minute; a free minute or hour keeps it minutely
+    if byminute is not None and byhour is not None:
+        if "bymonthday" in arguments and "byweekday" not in arguments:
+            frequency = rrule.MONTHLY
+        else:
+            frequency = rrule.DAILY
+    else:
+        frequency = rrule.MINUTELY
+    return rrule.rrule(frequency, **arguments)
 
 
+@functools.lru_cache(maxsize=128)
 def get_year_filter(year):
-    """Creates a filter for a year"""
+    """Creates a filter for a year
+
+    The filters are stateless so the closures are cached and shared
+    between all schedules built for the same year token.
+    """
+
+    if year == "*":
+        def year_filter(occurrence):
+            """Filter for a star year, which any occurrence satisfies"""
+            return True
+        return year_filter
+
+    valid_year = int(year)
 
     def year_filter(occurrence):
         """Filter for years
 
-        Using the year captured the closure, returns false if the occurrence
-        is before the year, true when is in the year and stops when is past
+        Using the year captured in the closure, returns false if the
+        occurrence is before the year, true when is in the year and stops
+        when is past
         """
-        if year == "*":
-            return True
+        if occurrence.year < valid_year:
+            return False
+        elif occurrence.year > valid_year:
+            raise StopIteration("Valid time already past")
         else:
-            valid_year = int(year)
-            if occurrence.year < valid_year:
-                return False
-            elif occurrence.year > valid_year:
-                raise StopIteration("Valid time already past")
-            else:
-                return True
+            return True
 
     return year_filter
 